@@ -1,15 +1,79 @@
 from fastapi import FastAPI, HTTPException, Body, Query
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Union
 import httpx
+import hishel
+from hishel.httpx import AsyncCacheTransport
+import asyncio
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+import lxml.html
+from lxml import etree
+import soupsieve as sv
 from abc import ABC, abstractmethod
-import json
+import orjson
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import logging
 import urllib.parse
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_TTL = 300
+
+
+class _OkResponsesOnly(hishel.BaseFilter[hishel.Response]):
+    """Cache only 200 responses so failed fetches are still retried."""
+
+    def needs_body(self) -> bool:
+        return False
+
+    def apply(self, item: hishel.Response, body: bytes | None) -> bool:
+        return item.status_code == 200
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for the whole app so connections (and their TLS
+    # sessions) are reused across articles, sources and API calls.
+    # Connect/DNS failures are retried in the transport; HTTP-level failures
+    # are retried by NewsScraperBase.fetch.
+    network = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(
+            max_connections=100, max_keepalive_connections=50, keepalive_expiry=30
+        ),
+    )
+    # Successful pages are cached on disk for HTTP_CACHE_TTL seconds regardless
+    # of the sites' Cache-Control, so overlapping scrapes don't refetch them.
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    transport = AsyncCacheTransport(
+        next_transport=network,
+        storage=hishel.AsyncSqliteStorage(
+            database_path=os.path.join(HTTP_CACHE_DIR, "responses.db"),
+            default_ttl=HTTP_CACHE_TTL,
+        ),
+        policy=hishel.FilterPolicy(response_filters=[_OkResponsesOnly()]),
+    )
+    app.state.client = httpx.AsyncClient(transport=transport, timeout=15)
+    try:
+        yield
+    finally:
+        await app.state.client.aclose()
+
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=lifespan)
 
 # Create data directory if it doesn't exist
 DATA_DIR = "data"
@@ -17,11 +81,116 @@ os.makedirs(DATA_DIR, exist_ok=True)
 
 
 # Helper functions for DBC News
+_BN2EN_TABLE = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+# Same, but also drops ordinal day suffixes ("১লা", "২রা", "৪ঠা", "৯ই", "২১শে")
+_BN_DAY_TABLE = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789", "লারঠইশে")
+
+# Relative-time words mapped to their timedelta keyword
+_BN_TIME_UNITS = {"মিনিট": "minutes", "ঘন্টা": "hours", "দিন": "days"}
+
+# Patterns used on every article, compiled once
+_ORDINAL_RE = re.compile(r"(\d+)(st|nd|rd|th)")
+_NEXT_IMG_URL_RE = re.compile(r"url=([^&]+)")
+
+# Helpers for Jamuna's English dates (e.g., "10 May 2025 12:32 AM")
+_EN_MONTHS = {
+    "January": 1,
+    "February": 2,
+    "March": 3,
+    "April": 4,
+    "May": 5,
+    "June": 6,
+    "July": 7,
+    "August": 8,
+    "September": 9,
+    "October": 10,
+    "November": 11,
+    "December": 12,
+}
+_AMPM_OFFSET = {"AM": 0, "PM": 12}
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching elements whose class list contains `name`."""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def _stripped_text(el: etree._Element) -> str:
+    """lxml counterpart of BeautifulSoup's `get_text(strip=True)`."""
+    return "".join(s.strip() for s in el.itertext())
+
+
+def _html_tree(response: httpx.Response) -> etree._Element:
+    """Parse a buffered response with lxml.html.
+
+    Pages whose headers name no charset are decoded as UTF-8, like
+    `response.text`, instead of libxml2's Latin-1 default.
+    """
+    parser = lxml.html.HTMLParser(encoding=response.charset_encoding or "utf-8")
+    return lxml.html.fromstring(response.content, parser=parser)
+
+
+class _ArticleStrainer(ElementFilter):
+    """`parse_only` filter that keeps only the subtrees an article parser reads.
+
+    Each rule is a `(tag, css_class)` pair where `None` matches anything.
+    Tags that don't match are skipped but their children are still examined,
+    so a wanted element is found however deeply it is nested.
+    """
+
+    def __init__(self, *rules: tuple):
+        self.rules = rules
+
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        classes = (attrs or {}).get("class", "").split()
+        return any(
+            tag in (None, name) and (css_class is None or css_class in classes)
+            for tag, css_class in self.rules
+        )
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False
+
+
+_JAMUNA_STRAINER = _ArticleStrainer(
+    ("h1", "story-title"),
+    ("img", "wp-post-image"),
+    ("span", "date"),
+    (None, "article-content"),
+)
+
+# CSS selectors used on every article, compiled once
+_SEL_JAM_TITLE = sv.compile("h1.story-title.entry-title")
+_SEL_JAM_IMAGE = sv.compile("img.wp-post-image")
+_SEL_JAM_DATE = sv.compile("span.date time")
+_SEL_JAM_PARAS = sv.compile(".article-content p")
+
+_DBC_LINKS_XPATH = etree.XPath('//a[contains(@href, "/articles/")]/@href')
+
+# Every field of a DBC article page (title, subtitle, cover image, date and
+# paragraphs), selected in one pass and returned in document order
+_DBC_XPATH = etree.XPath(
+    "(.//h1)[1]"
+    " | (.//h3)[1]"
+    " | (.//img[contains(@src, 'api.dbcnews.tv')])[1]"
+    f" | (.//span[{_has_class('text-sm')} and {_has_class('whitespace-nowrap')}])[1]"
+    f" | .//div[{_has_class('article-content-wrapper')}]//p"
+)
+
+# The elements _DBC_XPATH reads; the page stops streaming once all have closed
+_DBC_STREAM_TARGETS = {
+    "h1": lambda el: True,
+    "h3": lambda el: True,
+    "img": lambda el: "api.dbcnews.tv" in el.get("src", ""),
+    "span": lambda el: {"text-sm", "whitespace-nowrap"}.issubset(
+        el.get("class", "").split()
+    ),
+    "div": lambda el: "article-content-wrapper" in el.get("class", "").split(),
+}
+
+
 def convert_bengali_to_english_digits(s: str) -> str:
-    bengali_digits = "০১২৩৪৫৬৭৮৯"
-    return "".join(
-        str(bengali_digits.index(ch)) if ch in bengali_digits else ch for ch in s
-    )
+    return s.translate(_BN2EN_TABLE)
 
 
 def parse_bengali_date(raw: str) -> str:
@@ -32,35 +201,18 @@ def parse_bengali_date(raw: str) -> str:
 
     # Handle relative time (e.g., "৩ ঘন্টা আগে", "৫ মিনিট আগে", "১ দিন আগে")
     if "আগে" in raw:
+        unit = next((u for word, u in _BN_TIME_UNITS.items() if word in raw), None)
+        if not unit:
+            return None
+
         try:
-            parts = raw.split(" ")
-            num_raw = parts[0]
-            num = int(convert_bengali_to_english_digits(num_raw))
-
-            unit = None
-            if "মিনিট" in raw:
-                unit = "minute"
-            elif "ঘন্টা" in raw:
-                unit = "hour"
-            elif "দিন" in raw:
-                unit = "day"
-
-            if not unit:
-                return None
-
-            now = datetime.now()
-            if unit == "minute":
-                now = now.replace(minute=now.minute - num)
-            elif unit == "hour":
-                now = now.replace(hour=now.hour - num)
-            elif unit == "day":
-                now = now.replace(day=now.day - num)
-
-            return now.isoformat()
-        except Exception as e:
-            print(f"Failed to parse relative date: {e}")
+            num = int(convert_bengali_to_english_digits(raw.split(" ")[0]))
+        except ValueError as e:
+            logger.debug("Failed to parse relative date %r: %s", raw, e)
             return None
 
+        return (datetime.now() - timedelta(**{unit: num})).isoformat()
+
     # Handle absolute date (e.g., "৯ই মে ২০২৫ ০১:০৫:৫১ অপরাহ্ন")
     months = {
         "জানুয়ারি": "01",
@@ -79,8 +231,10 @@ def parse_bengali_date(raw: str) -> str:
 
     try:
         parts = raw.split(" ")
-        day_raw = re.sub(r"[^০-৯]", "", parts[1])  # remove "শে"
-        day = convert_bengali_to_english_digits(day_raw).zfill(2)
+        day = parts[1].translate(_BN_DAY_TABLE)
+        if not day.isdigit():  # stray punctuation or an unlisted suffix
+            day = "".join(filter(str.isdigit, day))
+        day = day.zfill(2)
         month = months.get(parts[2], "01")
         year = convert_bengali_to_english_digits(parts[3])
 
@@ -98,16 +252,35 @@ def parse_bengali_date(raw: str) -> str:
 
         return f"{year}-{month}-{day}T{hour:02d}:{minute:02d}:{second:02d}"
     except Exception as e:
-        print(f"Failed to parse absolute date: {e}")
+        logger.debug("Failed to parse absolute date %r: %s", raw, e)
         return None
 
 
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed request is worth retrying (network error or 5xx)."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+_retry_transient = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.2, max=2),
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+
+
 # -------------------------------
 # Base Class
 # -------------------------------
 class NewsScraperBase(ABC):
+    # Max article requests in flight against one origin
+    max_concurrency = 8
+
     def __init__(self, url: str):
         self.base_url = url
+        self._sem = asyncio.Semaphore(self.max_concurrency)
 
     @abstractmethod
     async def get_article_links(self, client: httpx.AsyncClient) -> List[str]: ...
@@ -117,17 +290,71 @@ class NewsScraperBase(ABC):
         self, client: httpx.AsyncClient, url: str
     ) -> Dict[str, Any]: ...
 
+    @_retry_transient
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        """GET a page, capped at `max_concurrency` concurrent requests.
+
+        Error responses raise instead of being parsed; network errors and 5xx
+        are retried with backoff, outside the semaphore.
+        """
+        async with self._sem:
+            response = await client.get(url)
+        response.raise_for_status()
+        return response
+
+    @_retry_transient
+    async def fetch_tree(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        targets: Dict[str, Callable[[etree._Element], bool]],
+    ) -> etree._Element:
+        """Stream a page into an lxml.html tree, stopping as early as possible.
+
+        `targets` maps tag names to a test for the element wanted. Once every
+        test has matched a fully parsed element, parsing stops and so does the
+        download, so the rest of the page is never transferred. The exception
+        is a response the HTTP cache is storing: hishel only commits an entry
+        once its body has been read in full, so the remainder is read unparsed
+        and later fetches of the page are served from the cache. Limits and
+        retries are the same as for `fetch`.
+        """
+        pending = dict(targets)
+        async with self._sem:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                storing = response.extensions.get("hishel_stored", False)
+                parser = etree.HTMLPullParser(
+                    events=("end",),
+                    tag=list(targets),
+                    encoding=response.charset_encoding or "utf-8",
+                )
+                parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+                async for chunk in response.aiter_bytes(65536):
+                    if not pending:
+                        continue  # only read on so the cache entry is stored
+                    parser.feed(chunk)
+                    for _, el in parser.read_events():
+                        test = pending.get(el.tag)
+                        if test is not None and test(el):
+                            del pending[el.tag]
+                    if not pending and not storing:
+                        break
+        return parser.close()
+
     async def scrape(
         self, client: httpx.AsyncClient, limit: int = 5
     ) -> List[Dict[str, Any]]:
         links = await self.get_article_links(client)
+        urls = links[:limit]
+        tasks = [self.parse_article(client, url) for url in urls]
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
         results = []
-        for url in links[:limit]:
-            try:
-                data = await self.parse_article(client, url)
+        for url, data in zip(urls, outcomes):
+            if isinstance(data, Exception):
+                logger.warning("Failed to parse %s: %s", url, data)
+            else:
                 results.append(data)
-            except Exception as e:
-                print(f"Failed to parse {url}: {e}")
         return results
 
 
@@ -136,40 +363,45 @@ class NewsScraperBase(ABC):
 # -------------------------------
 class JamunaScraper(NewsScraperBase):
     async def get_article_links(self, client: httpx.AsyncClient) -> List[str]:
-        response = await client.get(self.base_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        selectors = [".headline-link", ".entry-title a"]
+        response = await self.fetch(client, self.base_url)
+        tree = _html_tree(response)
+        xpaths = [
+            f"//*[{_has_class('headline-link')}]/@href",
+            f"//*[{_has_class('entry-title')}]//a/@href",
+        ]
         links = []
-        for sel in selectors:
-            for tag in soup.select(sel):
-                href = tag.get("href")
-                if href and href.startswith("http"):
+        for xpath in xpaths:
+            for href in tree.xpath(xpath):
+                if href.startswith("http"):
                     links.append(href)
         return list(dict.fromkeys(links))  # Remove duplicates
 
     async def parse_article(
         self, client: httpx.AsyncClient, url: str
     ) -> Dict[str, Any]:
-        response = await client.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
+        response = await self.fetch(client, url)
+        soup = BeautifulSoup(response.content, "lxml", parse_only=_JAMUNA_STRAINER)
 
-        title = soup.select_one("h1.story-title.entry-title")
-        image = soup.select_one("img.wp-post-image")
-        raw_date = soup.select_one("span.date time")
-        p_tags = soup.select(".article-content p")
+        title = _SEL_JAM_TITLE.select_one(soup)
+        image = _SEL_JAM_IMAGE.select_one(soup)
+        raw_date = _SEL_JAM_DATE.select_one(soup)
+        p_tags = _SEL_JAM_PARAS.select(soup)
 
-        content = "\n".join(
-            p.get_text(strip=True) for p in p_tags if p.get_text(strip=True)
-        )
+        content = "\n".join(t for p in p_tags if (t := p.get_text(strip=True)))
 
         # Normalize date
         published_at = None
         if raw_date:
             raw = raw_date.get_text(strip=True)
-            raw = re.sub(r"(\d+)(st|nd|rd|th)", r"\1", raw).replace(",", "")
+            raw = _ORDINAL_RE.sub(r"\1", raw).replace(",", "")
             try:
-                published_at = datetime.strptime(raw, "%d %B %Y %I:%M %p").isoformat()
-            except ValueError:
+                day, month, year, clock, ampm = raw.split()
+                hour, minute = map(int, clock.split(":"))
+                hour = hour % 12 + _AMPM_OFFSET[ampm.upper()]
+                published_at = datetime(
+                    int(year), _EN_MONTHS[month], int(day), hour, minute
+                ).isoformat()
+            except (ValueError, KeyError):
                 published_at = raw
 
         return {
@@ -186,53 +418,50 @@ class JamunaScraper(NewsScraperBase):
 # -------------------------------
 class DBCNewsScraper(NewsScraperBase):
     async def get_article_links(self, client: httpx.AsyncClient) -> List[str]:
-        response = await client.get(self.base_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        links = []
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            if "/articles/" in href:
-                full_url = (
-                    href if href.startswith("http") else f"https://dbcnews.tv{href}"
-                )
-                links.append(full_url)
-        return list(dict.fromkeys(links))
+        response = await self.fetch(client, self.base_url)
+        tree = _html_tree(response)
+        seen = {}  # ordered set of article URLs
+        for href in _DBC_LINKS_XPATH(tree):
+            seen[href if href[:4] == "http" else f"https://dbcnews.tv{href}"] = None
+        return list(seen)
 
     async def parse_article(
         self, client: httpx.AsyncClient, url: str
     ) -> Dict[str, Any]:
-        response = await client.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        title = soup.find("h1")
-        subtitle = soup.find("h3")
-        image = soup.find("img", src=re.compile("api.dbcnews.tv"))
-        raw_date_el = soup.select_one("span.text-sm.whitespace-nowrap")
+        tree = await self.fetch_tree(client, url, _DBC_STREAM_TARGETS)
+
+        title = subtitle = image = raw_date_el = None
+        paragraphs = []
+        for el in _DBC_XPATH(tree):
+            if el.tag == "p":
+                if t := _stripped_text(el):
+                    paragraphs.append(t)
+            elif el.tag == "h1":
+                title = el
+            elif el.tag == "h3":
+                subtitle = el
+            elif el.tag == "img":
+                image = el
+            elif el.tag == "span":
+                raw_date_el = el
 
         # Get article content
-        paragraphs = [
-            p.get_text(strip=True)
-            for p in soup.select("div.article-content-wrapper p")
-            if p.get_text(strip=True)
-        ]
-
-        content = "\n\n".join(
-            filter(None, [subtitle.text.strip() if subtitle else ""] + paragraphs)
-        )
+        lead = subtitle.text_content().strip() if subtitle is not None else ""
+        content = "\n\n".join(filter(None, [lead] + paragraphs))
 
         # Parse date
         published_at = None
-        if raw_date_el:
-            raw_date = raw_date_el.get_text(strip=True)
+        if raw_date_el is not None:
+            raw_date = _stripped_text(raw_date_el)
             published_at = parse_bengali_date(raw_date)
 
         # Get full image URL
         image_url = None
-        if image and image.get("src"):
-            src = image["src"]
+        if image is not None and image.get("src"):
+            src = image.get("src")
             if src.startswith("/_next/image"):
                 # Extract the actual URL from the Next.js image URL
-                match = re.search(r"url=([^&]+)", src)
+                match = _NEXT_IMG_URL_RE.search(src)
                 if match:
                     image_url = urllib.parse.unquote(match.group(1))
             else:
@@ -240,7 +469,7 @@ class DBCNewsScraper(NewsScraperBase):
 
         return {
             "url": url,
-            "title": title.text.strip() if title else "",
+            "title": title.text_content().strip() if title is not None else "",
             "cover_image": image_url or "",
             "published_at": published_at,
             "content": content,
@@ -264,43 +493,60 @@ def get_scraper(source: str, url: str = None) -> NewsScraperBase:
     return SCRAPER_MAP[source](url or SCRAPER_CONFIG.get(source))
 
 
-def save_to_json(source: str, data: List[Dict[str, Any]]) -> None:
-    """Save scraped data to a JSON file."""
+def _write_json(filename: str, data: List[Dict[str, Any]], pretty: bool) -> None:
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0))
+
+
+async def save_to_json(
+    source: str, data: List[Dict[str, Any]], pretty: bool = False
+) -> None:
+    """Save scraped data to a JSON file without blocking the event loop."""
     filename = os.path.join(DATA_DIR, f"{source}.json")
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    await asyncio.to_thread(_write_json, filename, data, pretty)
 
 
 # -------------------------------
 # API Endpoints
 # -------------------------------
 @app.get("/scrape-all")
-async def scrape_all() -> Dict[str, List[Dict[str, Any]]]:
-    async with httpx.AsyncClient(timeout=15) as client:
-        results = {}
-        for source in SCRAPER_MAP:
-            try:
-                scraper = get_scraper(source)
-                data = await scraper.scrape(client)
-                results[source] = data
-                # Save results for each source
-                save_to_json(source, data)
-            except Exception as e:
-                results[source] = {"error": str(e)}
-        return results
+async def scrape_all(
+    pretty: bool = Query(default=False),
+) -> Dict[str, Union[List[Dict[str, Any]], Dict[str, str]]]:
+    client = app.state.client
+    scrapers = {source: get_scraper(source) for source in SCRAPER_MAP}
+    # Run every source concurrently; one failing doesn't cancel the others
+    outcomes = await asyncio.gather(
+        *(scraper.scrape(client) for scraper in scrapers.values()),
+        return_exceptions=True,
+    )
+    results = {}
+    for source, data in zip(scrapers, outcomes):
+        results[source] = {"error": str(data)} if isinstance(data, Exception) else data
+
+    # Save results for each source in one batch, skipping failed ones
+    await asyncio.gather(
+        *(
+            save_to_json(source, data, pretty)
+            for source, data in results.items()
+            if not (isinstance(data, dict) and "error" in data)
+        )
+    )
+    return results
 
 
 @app.get("/scrape/{source}")
 async def scrape_single_source(
-    source: str, url: str = Query(default=None)
+    source: str,
+    url: str = Query(default=None),
+    pretty: bool = Query(default=False),
 ) -> List[Dict[str, Any]]:
     try:
         scraper = get_scraper(source, url)
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        data = await scraper.scrape(client)
-        # Save results for the source
-        save_to_json(source, data)
-        return data
+    data = await scraper.scrape(app.state.client)
+    # Save results for the source
+    await save_to_json(source, data, pretty)
+    return data